@@ -9,6 +9,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, accuracy_score
 import joblib
 from datetime import datetime, timedelta
+import operator
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -218,6 +219,34 @@ class DemandForecastingML:
         self.scaler = StandardScaler()
         self.categories = ['Fashion & Apparel', 'Home & Kitchen', 'Electronics', 
                           'Beauty & Personal Care', 'Sports & Fitness']
+        
+        # City clusters by population band (Tier 3 < 10 lakh <= Tier 2 < 40 lakh <= Tier 1)
+        self.city_clusters = ['Tier 3', 'Tier 2', 'Tier 1']
+        self.cluster_population_bins = np.array([1000000, 4000000])
+        
+        # Festival sale periods as (month, first_day, last_day), approximated on the Gregorian calendar
+        self.festival_periods = [
+            (1, 20, 26),    # Republic Day sales
+            (3, 1, 15),     # Holi
+            (8, 10, 15),    # Independence Day sales
+            (10, 1, 31),    # Navratri, Dussehra and Diwali season
+            (11, 1, 15),    # Diwali and Bhai Dooj
+            (12, 20, 31)    # Christmas and New Year
+        ]
+        self.festival_calendar = np.zeros((13, 32), dtype=bool)  # [month, day] lookup
+        for month, first_day, last_day in self.festival_periods:
+            self.festival_calendar[month, first_day:last_day + 1] = True
+        days_in_month = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+        self.festival_day_share = self.festival_calendar[1:].sum(axis=1) / days_in_month
+        
+        # Learned seasonal index [category, cluster, month - 1]; None until trained. The last
+        # cluster row is the pooled profile, used for cities with no known cluster (index -1)
+        self.seasonal_index = None
+        self.festival_uplift = None
+        self.seasonal_trained = np.zeros(len(self.categories), dtype=bool)
+        self.seasonal_min_month_days = 3    # Pooled days needed in every month to trust a category
+        self.seasonal_shrinkage_days = 14   # Cluster days at which its own profile gets half weight
+        self.seasonal_fit_iterations = 5    # Alternating cluster level / month profile updates
     
     def train_demand_models(self, historical_data):
         """
@@ -228,13 +257,182 @@ class DemandForecastingML:
         for category in self.categories:
             # Initialize models for each category
             self.category_models[category] = RandomForestRegressor(n_estimators=150, random_state=42)
-            self.seasonal_models[category] = GradientBoostingClassifier(n_estimators=100, random_state=42)
+        
+        self.train_seasonal_models(historical_data)
         
         print("✅ Demand Forecasting Models initialized!")
     
-    def predict_category_demand(self, city_data, category, months_ahead=12):
+    def train_seasonal_models(self, historical_data):
+        """
+        Learn month-of-year and festival-period demand profiles per category and city cluster
+
+        historical_data is a DataFrame or list of order records with 'category', 'order_date' and
+        optionally 'orders' (records without it count as one order), 'is_festival', and
+        'city_cluster' or 'population'. Records with no cluster or population only inform the
+        pooled profile. All categories are fitted together in one vectorized pass and the result
+        is stored as a [category, cluster, month] lookup table in self.seasonal_index. Only
+        categories with enough history in every month are marked in self.seasonal_trained; the
+        rest keep the default seasonal patterns.
+        """
+        self.seasonal_index = None
+        self.festival_uplift = None
+        self.seasonal_trained = np.zeros(len(self.categories), dtype=bool)
+        self.seasonal_models = {}
+        
+        if isinstance(historical_data, pd.DataFrame):
+            orders = historical_data.copy()
+        else:
+            orders = pd.DataFrame(list(historical_data or []))
+        if orders.empty or not {'category', 'order_date'}.issubset(orders.columns):
+            print("⚠️ No historical order data, using default seasonal patterns")
+            return
+        
+        orders = orders[orders['category'].isin(self.categories)]
+        dates = pd.to_datetime(orders['order_date'], errors='coerce')
+        if 'orders' in orders.columns:
+            quantity = pd.to_numeric(orders['orders'], errors='coerce')
+        else:
+            quantity = pd.Series(1.0, index=orders.index)
+        valid = dates.notna() & quantity.notna() & (quantity >= 0)
+        if not valid.all():
+            print(f"⚠️ Skipping {(~valid).sum()} order records with invalid dates or quantities")
+        orders, dates, quantity = orders[valid], dates[valid], quantity[valid].to_numpy(dtype=float)
+        if orders.empty:
+            print("⚠️ No usable historical order records, using default seasonal patterns")
+            return
+        
+        # Clusters axis: labelled clusters, then one bucket for records with no cluster
+        n_categories, n_clusters = len(self.categories), len(self.city_clusters)
+        category_idx = pd.Categorical(orders['category'], categories=self.categories).codes
+        cluster_idx = self._city_cluster_index(orders)
+        cluster_idx = np.where(cluster_idx >= 0, cluster_idx, n_clusters)
+        month_idx = dates.dt.month.to_numpy() - 1
+        festival_idx = self.festival_calendar[dates.dt.month.to_numpy(), dates.dt.day.to_numpy()].astype(int)
+        if 'is_festival' in orders.columns:
+            # Flags from CSV/JSON arrive as strings, so parse them rather than relying on truthiness
+            flags = orders['is_festival']
+            parsed = flags.astype(str).str.strip().str.lower().isin(['true', '1', '1.0', 'yes', 'y'])
+            festival_idx = np.where(flags.isna().to_numpy(), festival_idx, parsed.to_numpy().astype(int))
+        
+        # Order totals and distinct observed days per [category, cluster, month, festival] cell
+        shape = (n_categories, n_clusters + 1, 12, 2)
+        cell = np.ravel_multi_index((category_idx, cluster_idx, month_idx, festival_idx), shape)
+        order_totals = np.bincount(cell, weights=quantity, minlength=np.prod(shape)).reshape(shape)
+        order_days = dates.dt.normalize().to_numpy()
+        day_keys = pd.DataFrame({'cell': cell, 'day': order_days}).drop_duplicates()
+        observed_days = np.bincount(day_keys['cell'], minlength=np.prod(shape)).reshape(shape)
+        
+        # Append the pooled (all records) profile as the last cluster column, counting each
+        # calendar day once however many clusters reported orders on it
+        pooled_shape = (n_categories, 1, 12, 2)
+        pooled_cell = np.ravel_multi_index((category_idx, np.zeros_like(month_idx), month_idx, festival_idx),
+                                           pooled_shape)
+        pooled_keys = pd.DataFrame({'cell': pooled_cell, 'day': order_days}).drop_duplicates()
+        pooled_days = np.bincount(pooled_keys['cell'], minlength=np.prod(pooled_shape)).reshape(pooled_shape)
+        order_totals = np.concatenate([order_totals, order_totals.sum(axis=1, keepdims=True)], axis=1)
+        observed_days = np.concatenate([observed_days, pooled_days], axis=1)
+        month_days = observed_days.sum(axis=3)
+        
+        # Shrinkage weight from each cluster's total observed days, so dense clusters keep their shape
+        cluster_days = month_days.sum(axis=2)
+        weight = cluster_days / (cluster_days + self.seasonal_shrinkage_days)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily_rate = order_totals / observed_days
+            
+            # Festival uplift: festival vs regular daily rate within the months that have both
+            both_observed = (observed_days > 0).all(axis=3)
+            festival_rate = np.where(both_observed, order_totals[..., 1], 0).sum(axis=2) / \
+                np.where(both_observed, observed_days[..., 1], 0).sum(axis=2)
+            regular_rate = np.where(both_observed, order_totals[..., 0], 0).sum(axis=2) / \
+                np.where(both_observed, observed_days[..., 0], 0).sum(axis=2)
+            raw_uplift = festival_rate / regular_rate
+            pooled_uplift = np.nan_to_num(raw_uplift[:, -1:], nan=1.0, posinf=1.0)
+            festival_uplift = np.where(np.isfinite(raw_uplift),
+                                       weight * raw_uplift + (1 - weight) * pooled_uplift, pooled_uplift)
+            
+            # Regular-day monthly rate, deflating festival days for months without regular days
+            base_rate = np.where(observed_days[..., 0] > 0, daily_rate[..., 0],
+                                 daily_rate[..., 1] / festival_uplift[..., None])
+            pooled_profile = base_rate[:, -1] / self._finite_mean(base_rate[:, -1])
+            
+            # Fit rate = cluster level * pooled month profile, so clusters of different size and
+            # coverage share one month shape rather than summing raw order totals
+            base_rate, month_days, weight = base_rate[:, :-1], month_days[:, :-1], weight[:, :-1]
+            observed = month_days > 0
+            for _ in range(self.seasonal_fit_iterations):
+                level = self._cluster_levels(base_rate, month_days, pooled_profile)
+                level_adjusted = np.where(observed, month_days * base_rate / level[..., None], 0)
+                pooled_profile = level_adjusted.sum(axis=1) / month_days.sum(axis=1)
+                pooled_profile = pooled_profile / self._finite_mean(pooled_profile)
+            level = self._cluster_levels(base_rate, month_days, pooled_profile)
+            
+            # Shrink each cluster toward the pooled profile, fill its unobserved months from the
+            # pool and rescale to a mean-1 profile
+            cluster_profile = base_rate / level[..., None]
+            pooled = pooled_profile[:, None]
+            month_profile = weight[..., None] * cluster_profile + (1 - weight[..., None]) * pooled
+            month_profile = np.where(observed & np.isfinite(month_profile), month_profile, pooled)
+            month_profile = month_profile / month_profile.mean(axis=2, keepdims=True)
+        
+        trained = (observed_days[:, -1].sum(axis=2) >= self.seasonal_min_month_days).all(axis=1) & \
+            np.isfinite(pooled_profile).all(axis=1)
+        if not trained.any():
+            print("⚠️ Not enough historical order data per month, using default seasonal patterns")
+            return
+        
+        # Labelled clusters plus the pooled row; the unlabelled bucket is not served on its own.
+        # Expected monthly factor = regular-day profile blended with the month's festival days,
+        # rescaled to mean 1 so it only redistributes the yearly level across months
+        month_profile = np.concatenate([month_profile[:, :n_clusters], pooled_profile[:, None]], axis=1)
+        festival_uplift = np.concatenate([festival_uplift[:, :n_clusters], pooled_uplift], axis=1)
+        seasonal_index = month_profile * (1 + self.festival_day_share * (festival_uplift[..., None] - 1))
+        seasonal_index = seasonal_index / seasonal_index.mean(axis=2, keepdims=True)
+        self.seasonal_trained = trained
+        self.festival_uplift = np.where(trained[:, None], festival_uplift, np.nan)
+        self.seasonal_index = np.where(trained[:, None, None], seasonal_index, np.nan)
+        self.seasonal_models = {category: self.seasonal_index[i] for i, category in enumerate(self.categories)
+                                if trained[i]}
+        
+        print(f"✅ Seasonal profiles learned for {trained.sum()} categories "
+              f"from {len(orders)} order records")
+    
+    def _finite_mean(self, profile):
+        """Mean over months of the finite entries, NaN when a row has none"""
+        finite = np.isfinite(profile)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(finite, profile, 0).sum(axis=-1, keepdims=True) / finite.sum(axis=-1, keepdims=True)
+    
+    def _cluster_levels(self, base_rate, month_days, pooled_profile):
+        """Day-weighted demand level of each cluster relative to the pooled month profile"""
+        observed = month_days > 0
+        return np.where(observed, month_days * base_rate, 0).sum(axis=2) / \
+            np.where(observed, month_days * pooled_profile[:, None], 0).sum(axis=2)
+    
+    def _city_cluster_index(self, records):
+        """Map city records (dict or DataFrame) to city cluster indices, -1 when unknown"""
+        if isinstance(records, dict):
+            if records.get('city_cluster') in self.city_clusters:
+                return self.city_clusters.index(records['city_cluster'])
+            if pd.isna(records.get('population')):
+                return -1
+            return int(np.digitize(records['population'], self.cluster_population_bins))
+        
+        if 'population' in records.columns:
+            population = pd.to_numeric(records['population'], errors='coerce').to_numpy(dtype=float)
+        else:
+            population = np.full(len(records), np.nan)
+        cluster_idx = np.where(np.isnan(population), -1,
+                               np.digitize(np.nan_to_num(population), self.cluster_population_bins))
+        if 'city_cluster' in records.columns:
+            named = pd.Categorical(records['city_cluster'], categories=self.city_clusters).codes
+            cluster_idx = np.where(named >= 0, named, cluster_idx)
+        return cluster_idx
+    
+    def predict_category_demand(self, city_data, category, months_ahead=12, month=None):
         """
         Predict demand for specific category in a city
+        month (1-12) selects the seasonal profile; defaults to the current month
         """
         # Feature engineering for demand prediction
         features = [
@@ -283,7 +481,7 @@ class DemandForecastingML:
         growth_potential = int(base_demand_score * market_maturity)
         
         # Seasonal adjustment
-        seasonal_factor = self._calculate_seasonal_factor(category, city_data)
+        seasonal_factor = self._calculate_seasonal_factor(category, city_data, month)
         
         return {
             'demand_score': int(base_demand_score),
@@ -304,8 +502,22 @@ class DemandForecastingML:
         else:
             return (city_data['age_18_35_percent'] / 100) * 0.5 + (city_data['age_36_50_percent'] / 100) * 0.5
     
-    def _calculate_seasonal_factor(self, category, city_data):
-        """Calculate seasonal demand variations"""
+    def _calculate_seasonal_factor(self, category, city_data, month=None):
+        """
+        Calculate seasonal demand variations
+        The category pattern and city variation set the yearly level; for trained categories the
+        learned mean-1 seasonal index spreads that level across months, so both paths share a scale
+        """
+        if month is None:
+            month = datetime.now().month
+        else:
+            try:
+                month = operator.index(month)
+            except TypeError:
+                raise ValueError(f"month must be an integer between 1 and 12, got {month!r}") from None
+            if not 1 <= month <= 12:
+                raise ValueError(f"month must be an integer between 1 and 12, got {month!r}")
+        
         base_seasonal = city_data.get('seasonal_demand_variation', 20) / 100
         
         # Category-specific seasonal patterns
@@ -317,7 +529,12 @@ class DemandForecastingML:
             'Sports & Fitness': 1.1   # Higher during fitness seasons
         }
         
-        return seasonal_patterns.get(category, 1.0) * (1 + base_seasonal)
+        seasonal_level = seasonal_patterns.get(category, 1.0) * (1 + base_seasonal)
+        if category in self.categories and self.seasonal_trained[self.categories.index(category)]:
+            # Unknown cluster (-1) reads the pooled row
+            seasonal_level *= float(self.seasonal_index[self.categories.index(category),
+                                                        self._city_cluster_index(city_data), month - 1])
+        return seasonal_level
 
 
 class SellerSuccessML:
@@ -589,12 +806,15 @@ class MLModelBridge:
         except Exception as e:
             print(f"⚠️ ML model initialization warning: {e}")
     
-    def calculate_market_intelligence(self, city_data):
+    def calculate_market_intelligence(self, city_data, month=None):
         """
         Main function to calculate all market intelligence metrics
         This would be called from the TypeScript application
+        month (1-12) selects the seasonal profile for demand forecasts; defaults to the current month
         """
         try:
+            forecast_month = month if month is not None else datetime.now().month
+            
             # Market scoring
             market_scores = self.market_scorer.predict_market_scores(city_data)
             
@@ -605,7 +825,7 @@ class MLModelBridge:
             
             for category in categories:
                 demand_forecasts[category] = self.demand_forecaster.predict_category_demand(
-                    city_data, category
+                    city_data, category, month=forecast_month
                 )
             
             # Risk assessment
@@ -615,6 +835,7 @@ class MLModelBridge:
                 'market_scores': market_scores,
                 'demand_forecasts': demand_forecasts,
                 'market_risk': market_risk,
+                'forecast_month': forecast_month,
                 'ml_confidence': 0.85,  # Model confidence score
                 'last_updated': datetime.now().isoformat()
             }
@@ -667,4 +888,4 @@ if __name__ == "__main__":
         print(f"✅ Risk Assessment: {results['market_risk']['overall_risk']}")
         print(f"✅ ML Confidence: {results['ml_confidence']}")
     else:
-        print("❌ ML calculation failed")
\ No newline at end of file
+        print("❌ ML calculation failed")
@@ -0,0 +1,182 @@
+# Tests for the seasonal demand profiles in DemandForecastingML
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlModels import DemandForecastingML, MLModelBridge
+
+DAYS_2023 = pd.date_range('2023-01-01', '2023-12-31')
+
+
+def daily_orders(category, orders_per_day, **record):
+    """One record per day of 2023; orders_per_day maps a date to its order count"""
+    return [{'category': category, 'order_date': day.strftime('%Y-%m-%d'), 'orders': orders_per_day(day),
+             **record} for day in DAYS_2023]
+
+
+def june_peak(peak, level=10):
+    return lambda day: level * (peak if day.month == 6 else 1)
+
+
+def expected_peak(peak):
+    """Mean-1 index of a profile that is flat except for a June multiplier"""
+    return peak / ((11 + peak) / 12), 1 / ((11 + peak) / 12)
+
+
+def tier(forecaster, name):
+    return forecaster.city_clusters.index(name)
+
+
+def festival_lift(forecaster, lift):
+    """Daily orders with a 3x June and the given lift on festival days"""
+    return lambda day: june_peak(3)(day) * (lift if forecaster.festival_calendar[day.month, day.day] else 1)
+
+
+def monthly_index(orders):
+    """Ground-truth mean-1 index: each month's mean daily orders over the yearly mean"""
+    frame = pd.DataFrame(orders)
+    monthly = frame.groupby(pd.to_datetime(frame['order_date']).dt.month)['orders'].mean()
+    return (monthly / monthly.mean()).to_numpy()
+
+
+@pytest.fixture
+def forecaster():
+    return DemandForecastingML()
+
+
+def test_recovers_month_and_festival_lift(forecaster):
+    orders = daily_orders('Fashion & Apparel', festival_lift(forecaster, 2), city_cluster='Tier 1')
+    for order, day in zip(orders, DAYS_2023):
+        order['is_festival'] = str(forecaster.festival_calendar[day.month, day.day])
+    forecaster.train_demand_models(pd.DataFrame(orders))
+
+    index = forecaster.seasonal_models['Fashion & Apparel']
+    assert forecaster.festival_uplift[0, tier(forecaster, 'Tier 1')] == pytest.approx(2, abs=1e-3)
+    assert index[tier(forecaster, 'Tier 1')] == pytest.approx(monthly_index(orders), abs=1e-3)
+
+
+def test_sparse_cluster_follows_pooled_profile(forecaster):
+    orders = daily_orders('Electronics', june_peak(3), city_cluster='Tier 1', is_festival=0)
+    orders += [
+        {'category': 'Electronics', 'order_date': '2023-06-05', 'population': 500000, 'orders': 3},
+        {'category': 'Electronics', 'order_date': '2023-06-06', 'population': 500000, 'orders': 3},
+        {'category': 'Electronics', 'order_date': '2023-07-05', 'population': 500000, 'orders': 1,
+         'is_festival': '0'}
+    ]
+    forecaster.train_demand_models(orders)
+
+    june, regular = expected_peak(3)
+    index = forecaster.seasonal_models['Electronics']
+    assert index[tier(forecaster, 'Tier 3'), 5] == pytest.approx(june, abs=1e-3)
+    assert index[tier(forecaster, 'Tier 3'), 6] == pytest.approx(regular, abs=1e-3)
+    assert index[tier(forecaster, 'Tier 2'), 5] == pytest.approx(june, abs=1e-3)
+
+
+def test_dense_cluster_keeps_its_own_shape(forecaster):
+    orders = daily_orders('Electronics', june_peak(1), city_cluster='Tier 1', is_festival=0)
+    orders += daily_orders('Electronics', june_peak(5), city_cluster='Tier 3', is_festival=0)
+    forecaster.train_demand_models(orders)
+
+    index = forecaster.seasonal_models['Electronics']
+    # Only the light shrinkage toward the pooled profile separates each from its own shape
+    assert index[tier(forecaster, 'Tier 1'), 5] == pytest.approx(1, abs=0.06)
+    assert index[tier(forecaster, 'Tier 3'), 5] == pytest.approx(expected_peak(5)[0], abs=0.06)
+
+
+def test_unlabelled_orders_only_inform_pooled_profile(forecaster):
+    orders = daily_orders('Electronics', june_peak(1), city_cluster='Tier 1', is_festival=0)
+    orders += daily_orders('Electronics', june_peak(5), is_festival=0)
+    forecaster.train_demand_models(orders)
+
+    index = forecaster.seasonal_models['Electronics']
+    assert index[tier(forecaster, 'Tier 1'), 5] == pytest.approx(1, abs=0.06)
+    assert np.allclose(index[tier(forecaster, 'Tier 3')], index[-1])  # No data, so pooled
+    assert index[-1, 5] > 1.5
+
+    # Cities without a cluster or population read the pooled row
+    factor = forecaster._calculate_seasonal_factor('Electronics', {'seasonal_demand_variation': 0}, 6)
+    assert factor == pytest.approx(1.1 * index[-1, 5])
+
+
+def test_untrained_category_keeps_default_pattern_on_same_scale(forecaster):
+    city = {'population': 2000000, 'seasonal_demand_variation': 20}
+    before = {category: forecaster._calculate_seasonal_factor(category, city, 6)
+              for category in forecaster.categories}
+    orders = daily_orders('Electronics', festival_lift(forecaster, 2), city_cluster='Tier 2')
+    forecaster.train_demand_models(orders)
+
+    assert list(forecaster.seasonal_trained) == [False, False, True, False, False]
+    beauty = forecaster._calculate_seasonal_factor('Beauty & Personal Care', city, 6)
+    assert beauty == before['Beauty & Personal Care']
+    # The learned index only spreads the default yearly level across months
+    yearly = np.mean([forecaster._calculate_seasonal_factor('Electronics', city, month)
+                      for month in range(1, 13)])
+    assert yearly == pytest.approx(before['Electronics'], rel=1e-6)
+
+
+@pytest.mark.parametrize('history', [
+    [], None, [{'category': 'Fashion & Apparel', 'order_date': '2023-06-01', 'orders': 5}]
+])
+def test_insufficient_history_leaves_category_untrained(forecaster, history):
+    forecaster.train_demand_models(history)
+    assert forecaster.seasonal_index is None
+    assert not forecaster.seasonal_trained.any()
+
+
+def test_retrain_without_data_resets_learned_profiles(forecaster):
+    forecaster.train_demand_models(daily_orders('Electronics', june_peak(3), city_cluster='Tier 1'))
+    assert forecaster.seasonal_trained.any()
+
+    forecaster.train_demand_models([])
+    assert forecaster.seasonal_index is None
+    assert forecaster.festival_uplift is None
+    assert forecaster.seasonal_models == {}
+    assert not forecaster.seasonal_trained.any()
+
+
+def test_invalid_quantities_are_dropped(forecaster):
+    orders = daily_orders('Electronics', june_peak(3), city_cluster='Tier 1', is_festival=0)
+    orders += [
+        {'category': 'Electronics', 'order_date': '2023-01-05', 'city_cluster': 'Tier 1', 'orders': -500},
+        {'category': 'Electronics', 'order_date': '2023-01-06', 'city_cluster': 'Tier 1', 'orders': 'n/a'},
+        {'category': 'Electronics', 'order_date': '2023-01-07', 'city_cluster': 'Tier 1', 'orders': None}
+    ]
+    forecaster.train_demand_models(orders)
+
+    index = forecaster.seasonal_models['Electronics']
+    assert index[tier(forecaster, 'Tier 1'), 0] == pytest.approx(expected_peak(3)[1], abs=1e-3)
+
+
+def test_string_festival_flags(forecaster):
+    orders = daily_orders('Electronics', lambda day: 10, city_cluster='Tier 1', is_festival='False')
+    orders[0]['is_festival'] = 'TRUE'
+    orders[0]['orders'] = 30
+    forecaster.train_demand_models(orders)
+
+    assert forecaster.festival_uplift[2, tier(forecaster, 'Tier 1')] == pytest.approx(3, abs=1e-3)
+
+
+@pytest.mark.parametrize('month', [0, 13, -1, 6.0, '6'])
+def test_invalid_month_raises(forecaster, month):
+    with pytest.raises(ValueError):
+        forecaster._calculate_seasonal_factor('Electronics', {'population': 2000000}, month)
+
+
+def test_bridge_reports_forecast_month():
+    bridge = MLModelBridge()
+    city = {**bridge_city(), 'seasonal_demand_variation': 20}
+    results = bridge.calculate_market_intelligence(city, month=10)
+    assert results['forecast_month'] == 10
+
+
+def bridge_city():
+    return {
+        'city_name': 'Rajkot', 'population': 1380000, 'age_18_35_percent': 45, 'age_36_50_percent': 30,
+        'avg_monthly_income': 52000, 'literacy_rate': 82, 'urbanization_percent': 88,
+        'internet_users_percent': 72, 'smartphone_penetration': 78, 'digital_payment_users': 52,
+        'social_media_users_percent': 42, 'existing_ecommerce_stores': 18, 'local_retail_stores_per_1000': 55,
+        'market_leaders_present': 2, 'highway_connectivity_km': 380, 'railway_stations': 4,
+        'airports_nearby': 1, 'warehouse_facilities': 8, 'gdp_per_capita': 195000, 'annual_growth_rate': 8.1,
+        'industrial_units': 920, 'employment_rate': 85, 'avg_delivery_distance_km': 35
+    }